@@ -1,51 +1,150 @@
 import streamlit as st
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-import plotly.express as px
-import json
+import numpy as np
+import orjson
+import io
 import os
 
+try:
+    import numba
+except ImportError:  # Optional: only used to speed up categorizing large uploads
+    numba = None
+
 st.set_page_config(page_title="Finance App", page_icon="💰", layout="wide")
 
 category_file = "categories.json"
 
+def build_keyword_index(categories):
+    return {
+        keyword.casefold().strip(): category
+        for category, keywords in categories.items()
+        if category != "Uncategorized"
+        for keyword in keywords
+    }
+
+@st.cache_data(show_spinner=False)
+def _load_categories(path, mtime):
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
 if "categories" not in st.session_state:
     st.session_state.categories = {
         "Uncategorized": [],
     }
-    
+
+if "keyword_index" not in st.session_state:
+    st.session_state.keyword_index = build_keyword_index(st.session_state.categories)
+
+if "categories_mtime" not in st.session_state:
+    st.session_state.categories_mtime = None
+
+if "categories_dirty" not in st.session_state:
+    st.session_state.categories_dirty = False
+
+# Only re-read categories.json when it changed on disk, not on every rerun
 if os.path.exists(category_file):
-    with open(category_file, "r") as f:
-        st.session_state.categories = json.load(f)
-        
+    categories_mtime = os.path.getmtime(category_file)
+    if categories_mtime != st.session_state.categories_mtime:
+        st.session_state.categories = _load_categories(category_file, categories_mtime)
+        st.session_state.keyword_index = build_keyword_index(st.session_state.categories)
+        st.session_state.categories_mtime = categories_mtime
+
 def save_categories():
-    with open(category_file, "w") as f:
-        json.dump(st.session_state.categories, f)
+    # Write to a temp file and swap it in so a crash never leaves a half-written file
+    tmp_file = category_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(orjson.dumps(st.session_state.categories))
+    os.replace(tmp_file, category_file)
+    st.session_state.categories_dirty = False
+    st.session_state.categories_mtime = os.path.getmtime(category_file)
+
+# Uploads bigger than this use the Numba kernel when it's installed
+NUMBA_MIN_ROWS = 10_000
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _fnv1a_hashes(buffer, starts, ends):
+        hashes = np.empty(len(starts), dtype=np.uint64)
+        for i in numba.prange(len(starts)):
+            h = np.uint64(14695981039346656037)
+            for j in range(starts[i], ends[i]):
+                h = (h ^ np.uint64(buffer[j])) * np.uint64(1099511628211)
+            hashes[i] = h
+        return hashes
+
+def _hash_strings(values):
+    # One NUL-joined UTF-8 buffer so the kernel hashes every record without touching Python objects
+    buffer = np.frombuffer("\x00".join(values).encode("utf-8"), dtype=np.uint8)
+    separators = np.flatnonzero(buffer == 0)
+    if len(separators) != len(values) - 1:
+        return None  # Some value contains a NUL byte, so records can't be split back apart
+    starts = np.concatenate(([0], separators + 1))
+    ends = np.concatenate((separators, [len(buffer)]))
+    return _fnv1a_hashes(buffer, starts, ends)
+
+def _categorize_hashed(details, keyword_index):
+    detail_hashes = _hash_strings(details.fillna("").tolist())
+    keyword_hashes = _hash_strings(list(keyword_index))
+    if detail_hashes is None or keyword_hashes is None:
+        return None
+
+    # Binary search each detail hash in the sorted keyword hashes
+    order = np.argsort(keyword_hashes)
+    sorted_hashes = keyword_hashes[order]
+    labels = np.array(list(keyword_index.values()), dtype=object)[order]
+    positions = np.searchsorted(sorted_hashes, detail_hashes).clip(max=len(sorted_hashes) - 1)
+    matched = (sorted_hashes[positions] == detail_hashes) & ~details.isna().to_numpy()
+
+    return np.where(matched, labels[positions], "Uncategorized")
 
 def categorize_transactions(df):
-    df["Category"] = "Uncategorized"
-    
-    for category, keywords in st.session_state.categories.items():
-        if category == "Uncategorized" or not keywords:
-            continue
-        
-        lowered_keywords = [keyword.lower().strip() for keyword in keywords]
-        
-        for idx, row in df.iterrows():
-            details = row["Details"].lower().strip()
-            if details in lowered_keywords:
-                df.at[idx, "Category"] = category
-                
-    return df  
+    categories = None
+    if numba is not None and len(df) > NUMBA_MIN_ROWS and st.session_state.keyword_index:
+        categories = _categorize_hashed(df["_details_norm"], st.session_state.keyword_index)
+    if categories is None:
+        categories = df["_details_norm"].map(st.session_state.keyword_index).fillna("Uncategorized")
+
+    # Fixed categorical dtype so groupbys and comparisons work on small integer codes
+    category_names = list(st.session_state.categories.keys())
+    if "Uncategorized" not in category_names:
+        category_names.append("Uncategorized")
+    df["Category"] = pd.Categorical(categories, categories=category_names)
+
+    return df
+
+def _read_csv(buffer):
+    try:
+        # Multi-threaded parse into Arrow-backed columns; the explicit string dtypes
+        # must name the pyarrow storage or they override dtype_backend
+        return pd.read_csv(
+            buffer,
+            engine="pyarrow",
+            dtype_backend="pyarrow",
+            dtype={"Details": "string[pyarrow]", "Amount": "string[pyarrow]", "Debit/Credit": "category"}
+        )
+    except ImportError:
+        buffer.seek(0)
+        return pd.read_csv(
+            buffer,
+            dtype={"Details": "string", "Amount": "string", "Debit/Credit": "category"}
+        )
+
+# Only the parse is cached; categorization depends on per-session categories and runs every time
+@st.cache_data(show_spinner=False, max_entries=5)
+def _parse_transactions(file_bytes):
+    df = _read_csv(io.BytesIO(file_bytes))
+    df.columns = [col.strip() for col in df.columns]
+    # to_numeric on a string column yields nullable Float64; keep plain float64 downstream
+    df["Amount"] = pd.to_numeric(df["Amount"].str.replace(",", "", regex=False)).astype("float64")
+    df["Date"] = pd.to_datetime(df["Date"], format="%d %b %Y", cache=True)
+    # Normalized once here and reused for keyword matching; hidden from display
+    df["_details_norm"] = df["Details"].str.casefold().str.strip()
+
+    return df
 
 def load_transactions(file):
     try:
-        df = pd.read_csv(file)
-        df.columns = [col.strip() for col in df.columns]
-        df["Amount"] = df["Amount"].str.replace(",", "").astype(float)
-        df["Date"] = pd.to_datetime(df["Date"], format="%d %b %Y") 
-        
-        return categorize_transactions(df)
+        return categorize_transactions(_parse_transactions(file.getvalue()))
     except Exception as e:
         st.error(f"Error processing file: {str(e)}")
         return None
@@ -54,63 +153,41 @@ def add_keyword_to_category(category, keyword):
     keyword = keyword.strip()
     if keyword and keyword not in st.session_state.categories[category]:
         st.session_state.categories[category].append(keyword)
-        save_categories()
+        if category != "Uncategorized":
+            st.session_state.keyword_index[keyword.casefold()] = category
+        st.session_state.categories_dirty = True
         return True
     
     return False
 
-def show_budget_recommendations(df):
-    st.subheader("💡 Budget Recommendations Based on Behavior")
-
-    df["Month"] = df["Date"].dt.to_period("M")
-    monthly_summary = df.groupby(["Month", "Category"])["Amount"].sum().reset_index()
-
-    if monthly_summary.empty:
-        st.info("Not enough data to generate recommendations.")
-        return
-
-    recent_month = monthly_summary["Month"].max()
-    last_month = monthly_summary[monthly_summary["Month"] == recent_month]
-    avg_per_category = monthly_summary.groupby("Category")["Amount"].mean().reset_index()
-
-    comparison = pd.merge(
-        last_month,
-        avg_per_category,
-        on="Category",
-        suffixes=("_last", "_avg")
+# Not cached: hashing the whole debits frame on every rerun costs about as much as this groupby
+def _monthly_summary(debits_df):
+    # Blank dates parse to NaT; drop them as the Period-based grouping did instead of casting NaN to int
+    debits_df = debits_df[debits_df["Date"].notna()]
+
+    # Integer year * 12 + (month - 1) keys group and sort much faster than Periods
+    dates = debits_df["Date"].dt
+    month_key = dates.year.to_numpy(dtype=np.int32) * 12 + dates.month.to_numpy(dtype=np.int32) - 1
+    debits_df = debits_df.assign(Month=month_key)
+    return debits_df.groupby(["Month", "Category"], sort=False, observed=True)["Amount"].sum().reset_index()
+
+# Figures are cached on the input frame so reruns skip rebuilding the Plotly JSON
+@st.cache_data(show_spinner=False, max_entries=5)
+def _expense_pie(category_totals):
+    import plotly.express as px  # Deferred so cold starts skip the Plotly import
+
+    return px.pie(
+        category_totals,
+        values="Amount",
+        names="Category",
+        title="Expenses by Category"
     )
 
-    comparison["Deviation (%)"] = ((comparison["Amount_last"] - comparison["Amount_avg"]) / comparison["Amount_avg"]) * 100
-    comparison["Suggested Budget"] = (comparison["Amount_avg"] * 0.9).round(2)
-
-    def status_tag(row):
-        if row["Deviation (%)"] > 20:
-            return "⚠️ Overspending"
-        elif row["Deviation (%)"] < -20:
-            return "🟢 Spending Less"
-        else:
-            return "✅ Within Range"
-
-    def generate_recommendation(row):
-        if row["Deviation (%)"] > 20:
-            return f"Reduce expenses in {row['Category']}."
-        elif row["Deviation (%)"] < -20:
-            return f"Good control in {row['Category']}."
-        else:
-            return "Maintain this level."
-
-    comparison["Status"] = comparison.apply(status_tag, axis=1)
-    comparison["Recommendation"] = comparison.apply(generate_recommendation, axis=1)
-
-    st.dataframe(
-        comparison[[
-            "Category", "Amount_last", "Amount_avg",
-            "Deviation (%)", "Suggested Budget", "Status", "Recommendation"
-        ]],
-        use_container_width=True
-    )
+@st.cache_data(show_spinner=False, max_entries=5)
+def _budget_bar(comparison):
+    import plotly.express as px
 
-    fig = px.bar(
+    return px.bar(
         comparison,
         x="Category",
         y=["Amount_last", "Suggested Budget"],
@@ -119,7 +196,62 @@ def show_budget_recommendations(df):
         labels={"value": "Amount", "variable": "Type"},
         text_auto=True
     )
-    st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_data(show_spinner=False, max_entries=5)
+def _forecast_bar(forecast_df):
+    import plotly.express as px
+
+    return px.bar(
+        forecast_df,
+        x="Category",
+        y="Predicted Amount",
+        title="📈 Predicted Spending by Category (Next Month)",
+        text_auto=True
+    )
+
+def budget_comparison(monthly_summary):
+    # Category x Month grid; months a category had no spending stay NaN so they don't drag the average down
+    pivot = monthly_summary.pivot_table(
+        index="Category", columns="Month", values="Amount", aggfunc="sum", observed=True
+    )
+    last_values = pivot.iloc[:, -1].to_numpy(dtype=float, na_value=np.nan)
+    spent_last_month = ~np.isnan(last_values)
+
+    categories = pivot.index.astype(str).to_numpy(dtype=object)[spent_last_month]
+    amount_last = last_values[spent_last_month]
+    amount_avg = np.nanmean(pivot.to_numpy(dtype=float, na_value=np.nan), axis=1)[spent_last_month]
+
+    deviation = (amount_last - amount_avg) / amount_avg * 100
+    overspending = deviation > 20
+    spending_less = deviation < -20
+
+    status = np.where(overspending, "⚠️ Overspending",
+                      np.where(spending_less, "🟢 Spending Less", "✅ Within Range"))
+    recommendation = np.where(overspending, "Reduce expenses in " + categories + ".",
+                              np.where(spending_less, "Good control in " + categories + ".", "Maintain this level."))
+
+    return pd.DataFrame({
+        "Category": categories,
+        "Amount_last": amount_last,
+        "Amount_avg": amount_avg,
+        "Deviation (%)": deviation,
+        "Suggested Budget": (amount_avg * 0.9).round(2),
+        "Status": status,
+        "Recommendation": recommendation
+    })
+
+def show_budget_recommendations(monthly_summary):
+    st.subheader("💡 Budget Recommendations Based on Behavior")
+
+    if monthly_summary.empty:
+        st.info("Not enough data to generate recommendations.")
+        return
+
+    comparison = budget_comparison(monthly_summary)
+
+    st.dataframe(comparison, use_container_width=True)
+
+    st.plotly_chart(_budget_bar(comparison), use_container_width=True)
 
     with st.expander("ℹ️ Deviation Range Legend"):
         st.markdown("""
@@ -128,53 +260,45 @@ def show_budget_recommendations(df):
         - 🟢 **Spending Less**: Deviation < -20%
         """)
 
-def show_spending_forecast(df):
+def show_spending_forecast(monthly):
     st.subheader("📊 Predicted Spending for Next Month")
 
-    df["Month"] = df["Date"].dt.to_period("M")
-    monthly = df.groupby(["Month", "Category"])["Amount"].sum().reset_index()
-
     if monthly.empty:
         st.info("Not enough data to forecast.")
         return
 
-    predictions = []
-
-    for category in monthly["Category"].unique():
-        cat_data = monthly[monthly["Category"] == category].copy()
-        cat_data = cat_data.sort_values("Month")
+    # Sort so each category's months are contiguous, then work on plain NumPy arrays
+    monthly = monthly.sort_values(["Category", "Month"])
+    codes, categories = pd.factorize(monthly["Category"])
+    y = monthly["Amount"].to_numpy(dtype=float)
 
-        # Assign numeric month numbers for ML
-        cat_data["Month_Num"] = range(1, len(cat_data) + 1)
-        X = cat_data[["Month_Num"]]
-        y = cat_data["Amount"]
+    n = np.bincount(codes)
+    group_start = np.cumsum(n) - n
+    x = (np.arange(len(codes)) - group_start[codes] + 1).astype(float)  # Month number within category
 
-        if len(X) >= 2:  # At least 2 months required for a trend
-            model = LinearRegression()
-            model.fit(X, y)
+    sum_x = np.bincount(codes, weights=x)
+    sum_y = np.bincount(codes, weights=y)
+    sum_xy = np.bincount(codes, weights=x * y)
+    sum_x2 = np.bincount(codes, weights=x * x)
 
-            next_month = pd.DataFrame({"Month_Num": [X["Month_Num"].max() + 1]})
-            predicted = model.predict(next_month)[0]
+    has_trend = n >= 2  # At least 2 months required for a trend
 
-            predictions.append({
-                "Category": category,
-                "Predicted Amount": round(predicted, 2)
-            })
+    # Closed-form least squares fit of Amount = a + b * Month_Num
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x ** 2)
+        intercept = (sum_y - slope * sum_x) / n
+    predicted = intercept + slope * (n + 1)
 
-    if not predictions:
+    if not has_trend.any():
         st.info("Need at least 2 months of data per category to forecast.")
     else:
-        forecast_df = pd.DataFrame(predictions)
+        forecast_df = pd.DataFrame({
+            "Category": np.asarray(categories)[has_trend],
+            "Predicted Amount": predicted[has_trend].round(2)
+        })
         st.dataframe(forecast_df, use_container_width=True)
 
-        fig = px.bar(
-            forecast_df,
-            x="Category",
-            y="Predicted Amount",
-            title="📈 Predicted Spending by Category (Next Month)",
-            text_auto=True
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_forecast_bar(forecast_df), use_container_width=True)
 
 
 def main():
@@ -186,9 +310,10 @@ def main():
         df = load_transactions(uploaded_file)
 
         if df is not None:
-            debits_df = df[df["Debit/Credit"] == "Debit"].copy()
-            credits_df = df[df["Debit/Credit"] == "Credit"].copy()
-            st.session_state.debits_df = debits_df.copy()
+            # Debit/Credit is read as a categorical, so these compare integer codes
+            # Boolean selection already returns a new frame, so the editor can write to it directly
+            st.session_state.debits_df = df.loc[df["Debit/Credit"].eq("Debit")]
+            credits_df = df.loc[df["Debit/Credit"].eq("Credit")]
 
             tab1, tab2, tab3, tab4 = st.tabs([
                     "💸 Expenses (Debits)",
@@ -226,16 +351,18 @@ def main():
 
                 save_button = st.button("Apply Changes", type="primary")
                 if save_button:
-                    for idx, row in edited_df.iterrows():
-                        new_category = row["Category"]
-                        if new_category == st.session_state.debits_df.at[idx, "Category"]:
-                            continue
-                        details = row["Details"]
-                        st.session_state.debits_df.at[idx, "Category"] = new_category
-                        add_keyword_to_category(new_category, details)
+                    old_categories = st.session_state.debits_df.loc[edited_df.index, "Category"].to_numpy()
+                    changed = edited_df["Category"].to_numpy() != old_categories
+
+                    for row in edited_df[changed].itertuples(index=True):
+                        st.session_state.debits_df.at[row.Index, "Category"] = row.Category
+                        add_keyword_to_category(row.Category, row.Details)
+
+                    if st.session_state.categories_dirty:
+                        save_categories()
 
                 st.subheader('Expense Summary')
-                category_totals = st.session_state.debits_df.groupby("Category")["Amount"].sum().reset_index()
+                category_totals = st.session_state.debits_df.groupby("Category", observed=True)["Amount"].sum().reset_index()
                 category_totals = category_totals.sort_values("Amount", ascending=False)
 
                 st.dataframe(
@@ -247,25 +374,21 @@ def main():
                     hide_index=True
                 )
 
-                fig = px.pie(
-                    category_totals,
-                    values="Amount",
-                    names="Category",
-                    title="Expenses by Category"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(_expense_pie(category_totals), use_container_width=True)
 
             with tab2:
                 st.subheader("Payments Summary")
                 total_payments = credits_df["Amount"].sum()
                 st.metric("Total Payments", f"{total_payments:,.2f} PKR")
-                st.write(credits_df)
+                st.write(credits_df.drop(columns="_details_norm"))
+
+            monthly_summary = _monthly_summary(st.session_state.debits_df)
 
             with tab3:
-                show_budget_recommendations(debits_df)
+                show_budget_recommendations(monthly_summary)
 
             with tab4:
-                show_spending_forecast(debits_df)
+                show_spending_forecast(monthly_summary)
 
 
 main()
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import _monthly_summary, budget_comparison
+
+JAN, MAR = 2025 * 12, 2025 * 12 + 2
+
+
+def make_debits(dates, categories, amounts):
+    return pd.DataFrame({
+        "Date": pd.to_datetime(dates, format="%d %b %Y"),
+        "Category": pd.Categorical(categories, categories=["Uncategorized", "food", "shopping"]),
+        "Amount": np.array(amounts, dtype="float64"),
+    })
+
+
+def assert_food_overspending_only(comparison):
+    assert comparison["Category"].tolist() == ["food"]
+    assert comparison["Amount_last"].tolist() == [300.0]
+    assert comparison["Amount_avg"].tolist() == [200.0]
+    assert np.isclose(comparison["Deviation (%)"].iloc[0], 50.0)
+    assert comparison["Status"].tolist() == ["⚠️ Overspending"]
+    assert comparison["Recommendation"].tolist() == ["Reduce expenses in food."]
+
+
+def test_budget_comparison_skips_category_missing_from_last_month():
+    debits_df = make_debits(
+        ["05 Jan 2025", "10 Feb 2025", "12 Feb 2025", "07 Mar 2025"],
+        ["food", "food", "shopping", "food"],
+        [100.0, 200.0, 50.0, 300.0],
+    )
+
+    assert_food_overspending_only(budget_comparison(_monthly_summary(debits_df)))
+
+
+def test_budget_comparison_ignores_blank_dates():
+    debits_df = make_debits(
+        ["05 Jan 2025", "10 Feb 2025", "12 Feb 2025", "07 Mar 2025", ""],
+        ["food", "food", "shopping", "food", "shopping"],
+        [100.0, 200.0, 50.0, 300.0, 999.0],
+    )
+
+    assert_food_overspending_only(budget_comparison(_monthly_summary(debits_df)))
+
+
+def test_monthly_summary_drops_blank_dates():
+    debits_df = make_debits(["05 Jan 2025", "", "07 Mar 2025"], ["food", "food", "food"], [100.0, 999.0, 300.0])
+
+    monthly_summary = _monthly_summary(debits_df).sort_values("Month")
+
+    assert monthly_summary["Month"].tolist() == [JAN, MAR]
+    assert monthly_summary["Amount"].tolist() == [100.0, 300.0]
+
+
+def test_hashed_categorization_matches_dict_lookup():
+    pytest.importorskip("numba")
+    from main import _categorize_hashed
+
+    keyword_index = {"foodpanda": "food", "daraz pk": "shopping", "netflix.com": "Subscriptions"}
+    details = pd.Series(["foodpanda", "unknown shop", None, "daraz pk", "", "netflix.com"], dtype="string")
+
+    expected = details.map(keyword_index).fillna("Uncategorized").tolist()
+
+    assert _categorize_hashed(details, keyword_index).tolist() == expected